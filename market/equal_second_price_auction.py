@@ -6,7 +6,10 @@ from random import Random
 from typing import Tuple, Optional, Iterable
 
 
-@dataclass(kw_only=True, init=True)
+# eq=False: bids compare (and hash) by identity, like any other object. A bid is a mutable commitment of
+# one particular cluster, so two clusters' bids with the same values are still different bids.
+# (This also avoids field-by-field comparisons and allows to use bids as dict keys)
+@dataclass(kw_only=True, init=True, slots=True, eq=False)
 class EqualSecondPriceBid(Bid):
     """
     Bid class for the equal second price auction class `EqualSecondPriceMarket`    
@@ -30,7 +33,8 @@ class EqualSecondPriceBid(Bid):
     def valuation_of_own_slots(self) -> int | float:
         return self.willing_to_pay
 
-    # @dataclass(kw_only=True, init=True) automatically generates this:
+    # @dataclass(kw_only=True, init=True, slots=True, eq=False) automatically generates this
+    # (and sets __slots__ to the declared fields):
 
     # def __init__(self,
     #             *,
@@ -67,20 +71,32 @@ class EqualSecondPriceMarket(Market):
     standing_bids: dict[Cluster, EqualSecondPriceBid | None]
 
     @staticmethod
-    def maximum_bid_by_side(maximum_individual_payments: list[int | float]):
+    def maximum_bid_by_side(maximum_individual_payments: Iterable[int | float]) -> int | float:
         """
         Given a list of maximum payments (typically the list of all payments from either the reveal or miss side of the bidders),
         this function determines the maximum amount that this side is willing to pay *collectively* according the market rules.
+        Any iterable is accepted. If there are no payments at all (e.g. nobody on that side placed a bid), this returns 0.
         """
 
         maximum_individual_payments_sorted = sorted(
             maximum_individual_payments, reverse=True)
-        # candidate_total_payments[i] is the maximum amount that that can be payed if the first i+1 people are the ones that pay and the rest pay 0.
-        candidate_total_payments = [
-            maximum_individual_payments_sorted[i] * (i + 1)
-            for i in range(len(maximum_individual_payments))
-        ]
-        return max(candidate_total_payments)
+        if not maximum_individual_payments_sorted:
+            return 0
+        n = len(maximum_individual_payments_sorted)
+
+        # The candidate for index i (counting from 1) is the maximum amount that that can be payed if the first i people
+        # are the ones that pay and the rest pay 0.
+        # Since the payments are sorted in decreasing order, no candidate from index i onwards can exceed payment * n,
+        # where payment is the i'th payment. Once this bound drops below the best candidate so far, we can stop.
+        # (In practice, the maximum is usually attained among the first few entries)
+        best = maximum_individual_payments_sorted[0]
+        for i, payment in enumerate(maximum_individual_payments_sorted, 1):
+            if payment * n <= best:
+                break
+            candidate = payment * i
+            if candidate > best:
+                best = candidate
+        return best
 
     def _determine_auction_winner(
             self, reveal_side: list[Cluster], miss_side: list[Cluster],
@@ -93,55 +109,81 @@ class EqualSecondPriceMarket(Market):
             The second one is a dict {cluster -> amount that cluster needs to actually pay}
         """
 
-        last_proposer_bid: Optional[EqualSecondPriceBid] = self.standing_bids[
-            last_slot_proposer]
-
-        if last_proposer_bid is None:  # this means the last slots proposer does not participate in the auction at all.
+        # The last slot proposer either does not participate in the auction at all or is not willing to receive bribes.
+        # (We use may_take_bribes, so that this check and the shortcuts that rely on it cannot drift apart)
+        if not self.may_take_bribes(last_slot_proposer):
             return 'reveal', {}
 
-        if not last_proposer_bid.willing_to_receive_bribes:  # this means the last proposer is not willing to receive bribes.
-            return 'reveal', {}
+        last_proposer_bid: Optional[EqualSecondPriceBid] = self.standing_bids[last_slot_proposer]
+        assert last_proposer_bid is not None  # guaranteed by may_take_bribes
 
         # The proposer's choice of reveal vs. miss affects the proposer itself by directly assigning some slots to itself.
         # Note that these do include the slot the lost slot proposer may intentionally miss, hence the own_slots_gained_by_revealing starts at 1.
 
-        payments: dict[Cluster, int | float] = {}
-        # After the last slot proposer has decided what to do, we define how much each participant will pay.
-
-        # Add the last proposer's bid to the list of bids to account for the fact that the last proposer gains one more slot in the reveal side
-        # due to the fact they don't (intentionally) miss the slot.
-        
-        reveal_side_bids = [self.standing_bids[c] for c in reveal_side] + [last_proposer_bid]
-        miss_side_bids = [self.standing_bids[c] for c in miss_side]
+        # Look up every bid exactly once. Mapping the bound __getitem__ over the sides does the lookups in C,
+        # without evaluating self.standing_bids for every single cluster.
+        get_bid = self.standing_bids.__getitem__
+        reveal_side_bids = list(map(get_bid, reveal_side))
+        miss_side_bids = list(map(get_bid, miss_side))
 
         # Remove duplicates from reveal_side and miss_side.
        
         # Note: The lenghts of these are possibly smaller than the above, because None-bids are filtered out (rather than replaced by 0)
-        reveal_side_bid_values = [bid.willing_to_pay for bid in reveal_side_bids if bid is not None]  
+        reveal_side_bid_values = [bid.willing_to_pay for bid in reveal_side_bids if bid is not None]
+        # Add the last proposer's bid to the list of bids to account for the fact that the last proposer gains one more slot in the reveal side
+        # due to the fact they don't (intentionally) miss the slot.
+        # (We add it only here rather than to reveal_side_bids, which must match reveal_side for the payments below)
+        reveal_side_bid_values.append(last_proposer_bid.willing_to_pay)
         miss_side_bid_values = [bid.willing_to_pay for bid in miss_side_bids if bid is not None]
 
-        maximum_miss_side_collective_bid = self.maximum_bid_by_side(miss_side_bid_values)
-        maximum_reveal_side_collective_bid = self.maximum_bid_by_side(reveal_side_bid_values + [last_proposer_bid.valuation_of_own_slots])
-        # For now, we assume the last_proposer_bid.valuation_of_own_slots behaves as a bid. Comment above and uncomment below otherwise.
+        # Shortcut: Often, nobody on the miss side is willing to pay anything (or nobody has a bid at all).
+        # Then the miss side's collective bid is 0 and we do not need to sort its bids.
+        if any(miss_side_bid_values):
+            maximum_miss_side_collective_bid = self.maximum_bid_by_side(miss_side_bid_values)
+        else:
+            maximum_miss_side_collective_bid = 0
+        # For now, we assume the last_proposer_bid.valuation_of_own_slots behaves as a bid. Remove the append and
+        # uncomment below otherwise.
+        reveal_side_bid_values.append(last_proposer_bid.valuation_of_own_slots)
+        maximum_reveal_side_collective_bid = self.maximum_bid_by_side(reveal_side_bid_values)
         # maximum_reveal_side_bids = self.maximum_bid_by_side(reveal_side_bid_values) + last_proposer_bid.valuation_of_own_slots
 
         should_reveal: bool = maximum_reveal_side_collective_bid + last_proposer_bid.minimum_gain > maximum_miss_side_collective_bid
 
         #TODO: fix: it may be the case there are different ways to achieve the maximun.
 
+        # After the last slot proposer has decided what to do, we define how much each participant will pay.
+        # We reuse the bids we looked up above rather than looking up standing_bids again for each cluster.
+        # (This is just the list of who should pay what. It needs to be executed by the caller)
+        payments: dict[Cluster, int | float]
         if should_reveal:
-            for c in reveal_side:
-                if self.standing_bids[c] is not None:
-                    payments[c] = self.standing_bids[c].willing_to_pay
-                else:
-                    payments[c] = 0
+            payments = {c: (bid.willing_to_pay if bid is not None else 0)
+                        for c, bid in zip(reveal_side, reveal_side_bids, strict=True)}
             return "reveal", payments
-            # This is just the list of who should pay what. Need to be excecuted by the Market
         else:
-            for c in miss_side:
-                if self.standing_bids[c] is not None:
-                    payments[c] = self.standing_bids[c].willing_to_pay
-                else:
-                    payments[c] = 0
+            payments = {c: (bid.willing_to_pay if bid is not None else 0)
+                        for c, bid in zip(miss_side, miss_side_bids, strict=True)}
             return "miss", payments
-        # TODO: This is just the list of who should pay what. Need to be excecuted by the Market
+
+    def may_take_bribes(self, cluster: Cluster) -> bool:
+        """
+        A cluster may take bribes only if it has a bid that states it is willing to receive bribes.
+        Otherwise, _determine_auction_winner always returns 'reveal', {}.
+        """
+        bid: Optional[EqualSecondPriceBid] = self.standing_bids[cluster]
+        return bid is not None and bid.willing_to_receive_bribes
+
+    def _determine_auction_winners(
+            self, sides: list[Tuple[list[Cluster], list[Cluster]]],
+            randomness_source: Random, last_slot_proposer: Cluster
+    ) -> list[Tuple[str, dict[Cluster, int | float]]]:
+        """
+        Batch version of _determine_auction_winner.
+        If the last slot proposer does not take bribes, every auction of the batch is won by "reveal"
+        and we do not need to look at the sides at all.
+        """
+        if not self.may_take_bribes(last_slot_proposer):
+            return [("reveal", {}) for _ in sides]
+        return super()._determine_auction_winners(sides=sides,
+                                                  randomness_source=randomness_source,
+                                                  last_slot_proposer=last_slot_proposer)
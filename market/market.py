@@ -1,9 +1,8 @@
 from abc import ABC, abstractmethod
 from collections import namedtuple
 from dataclasses import dataclass
-from itertools import islice
 from random import Random
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
 from participants import Cluster, StakeDistribution
 
@@ -11,7 +10,9 @@ from participants import Cluster, StakeDistribution
 # balance = Balance(payed=10, received=20).
 # We only allow key-value passing, because passing a list of numbers would just be confusing what they mean.
 # and the order is not canonical.
-@dataclass(kw_only=True)
+# slots=True means that instances do not carry a __dict__. This saves memory and makes attribute access faster,
+# but also means that one cannot add new attributes to a Balance that are not declared below.
+@dataclass(kw_only=True, slots=True)
 class Balance:
     """
     A Balance keeps track of all payments and earnings that an individual market participant has accrued.
@@ -62,6 +63,8 @@ class Balance:
         Also, it may happen that a participant gains a slot (randomly, essentially) by
         being in the winning A_miss - side of the bet, even if that participated never actually actively engaged.
         """
+        # NOTE: We do not cache this value: the simulation writes to the fields of a Balance far more often
+        # than anyone reads total_balance, so invalidating a cache on every write would cost more than it saves.
         return (self.received - self.paid - self.capital_cost -
                 self.transaction_costs + self.extra_slot_earnings -
                 self.extra_slot_costs - self.reputation_cost)
@@ -80,7 +83,8 @@ class Bid:
     Note that we shall assume that a given market participant can only ever have 1 standing bid to simplify the API.
     As such, a bid needs to be able to express both "I want to be bribed" and "I want to bribe" simultaneously.
     """
-    pass
+    # Empty __slots__, so derived classes that use __slots__ (e.g. via @dataclass(slots=True)) do not get a __dict__.
+    __slots__ = ()
 
 
 class Market(ABC):
@@ -96,6 +100,8 @@ class Market(ABC):
     # This is determined by stake_dist
     # access this via the participants @property
 
+    _participant_set: frozenset[Cluster]  # same as _participants, but allows O(1) membership tests.
+
     balance_sheets: dict[Cluster, Balance]  # balance sheet of every participant.
     
     standing_bids: dict[Cluster, Bid | None]  # current bid by the given participant.
@@ -141,8 +147,11 @@ class Market(ABC):
 
         # This place_bid method just implements some common logic that a derived class may call via super()
 
-        assert cluster in self.participants
+        assert cluster in self._participant_set
         old_bid = self.standing_bids[cluster]
+        if old_bid is None and bid is None:
+            # Nothing to do. In particular, cost_for_bid(None, None) is guaranteed to be (0, 0, 0).
+            return
         self.standing_bids[cluster] = bid
 
         # flag the participant as having placed a bid.
@@ -204,6 +213,7 @@ class Market(ABC):
             self.EPOCH_SIZE = epoch_size
         self.stake_dist = stake_dist
         self._participants = stake_dist.get_clusters()  # Use a property-setter to inform derived classes?
+        self._participant_set = frozenset(self._participants)
 
         # Initialize balance_sheets. We need to set self.balance_sheets[c] to some value for every c
         # even if we override it later, because calls to self.place_bide below would fail otherwise.
@@ -276,21 +286,40 @@ class Market(ABC):
         """
         ...
 
+    def get_best_bids(self, clusters: list[Cluster], *,
+                      randomness_source: Random) -> dict[Cluster, Bid]:
+        """
+        Batch version of get_best_bid: returns a dict {cluster -> best bid} for all the given clusters.
+        Each best bid is computed against the *current* standing bids, i.e. the bids of the
+        other clusters in the batch are not updated in between.
+
+        By default, this just calls get_best_bid for each cluster.
+        Derived classes may override this to compute statistics of the market that are shared among the
+        clusters in the batch (e.g. Monte-Carlo samples of the auction) only once.
+        """
+        return {c: self.get_best_bid(c, randomness_source=randomness_source) for c in clusters}
+
+    def may_take_bribes(self, cluster: Cluster) -> bool:  # noqa: ARG002
+        """
+        Returns False if the market can tell from cluster's standing bid alone that the cluster, as last slot proposer,
+        will never accept bribes, i.e. the auction is won by "reveal" without anyone paying anything,
+        no matter what the sides are. Callers may then skip sampling the sides and running the auction.
+
+        By default, we make no such promise and return True. Derived classes may override this.
+        """
+        return True
+
     def sample_sides(self, 
                      randomness_source: Optional[Random] = None) -> Tuple[list[Cluster], list[Cluster]]:
         """
         Samples the two sides of the bidding market in order (reveal, miss).
         There is one set of 32 future validators for reveal RANDAO vs another set of 32 validators for missing it.
         randomness_source is used to select the randomness source for the sampling;
-        by default, we use the randomness source from stake_dist itself via stake_dist.iterator.
+        by default, we use the default randomness source from stake_dist itself.
         """
-        if randomness_source is None:
-            reveal_side = list(islice(self.stake_dist.iterator, self.EPOCH_SIZE))
-            miss_side =   list(islice(self.stake_dist.iterator, self.EPOCH_SIZE))
-        else:
-            reveal_side = [self.stake_dist.sample_cluster(randomness_source=randomness_source) for _ in range(self.EPOCH_SIZE)]
-            miss_side = [self.stake_dist.sample_cluster(randomness_source=randomness_source) for _ in range(self.EPOCH_SIZE)]
-        return reveal_side, miss_side
+        # Draw both sides with a single call, which is much faster than sampling each cluster individually.
+        samples = self.stake_dist.sample_clusters(2 * self.EPOCH_SIZE, randomness_source=randomness_source)
+        return samples[:self.EPOCH_SIZE], samples[self.EPOCH_SIZE:]
 
     def get_auction_winner(
         self,
@@ -312,6 +341,68 @@ class Market(ABC):
         """
 
         # This method just does some common argument pre-processing and hands off to _determine_auction_winner.
+        real_randomness_source, [(reveal_side, miss_side)] = self._prepare_auctions(
+            [(reveal_side, miss_side)], randomness_source=randomness_source)
+        winner, payments = self._determine_auction_winner(reveal_side=reveal_side,
+                                                          miss_side=miss_side,
+                                                          randomness_source=real_randomness_source,
+                                                          last_slot_proposer=last_slot_proposer)
+        assert winner == "miss" or winner == "reveal"
+        return winner, payments
+
+    def get_auction_winners(
+        self,
+        *,
+        last_slot_proposer: Cluster,
+        sides: Optional[Sequence[Tuple[Optional[list[Cluster]], Optional[list[Cluster]]]]] = None,
+        number_of_auctions: int = 1,
+        randomness_source: Optional[Random] = None,
+    ) -> list[Tuple[str, dict[Cluster, int | float]]]:
+        """
+        Batch version of get_auction_winner: Determines the winners of several auctions that all have the same
+        last_slot_proposer and are run against the current standing bids.
+        This is intended for Monte-Carlo estimates (e.g. inside get_best_bid), where we evaluate many
+        samples for the same market state.
+
+        sides is a list of pairs (reveal_side, miss_side). If sides is None, we freshly sample number_of_auctions
+        many such pairs (unless may_take_bribes tells us that the result does not depend on the sides).
+        As for get_auction_winner, pairs where both sides are None are sampled freshly.
+        randomness_source has the same meaning as for get_auction_winner.
+
+        Returns a list with one entry (winner, payments) per auction, in the same order as sides.
+        """
+
+        unprepared_sides: Sequence[Tuple[Optional[list[Cluster]], Optional[list[Cluster]]]]
+        if sides is None:
+            # If the proposer does not take bribes, every auction is won by "reveal" without payments,
+            # so we do not need to sample any sides.
+            if not self.may_take_bribes(last_slot_proposer):
+                return [("reveal", {}) for _ in range(number_of_auctions)]
+            unprepared_sides = [(None, None)] * number_of_auctions
+        else:
+            unprepared_sides = sides
+
+        # Same pre-processing as in get_auction_winner.
+        real_randomness_source, prepared_sides = self._prepare_auctions(unprepared_sides,
+                                                                        randomness_source=randomness_source)
+        results = self._determine_auction_winners(sides=prepared_sides,
+                                                  randomness_source=real_randomness_source,
+                                                  last_slot_proposer=last_slot_proposer)
+        assert len(results) == len(prepared_sides)
+        assert all(winner == "miss" or winner == "reveal" for winner, _ in results)
+        return results
+
+    def _prepare_auctions(
+        self,
+        sides: Sequence[Tuple[Optional[list[Cluster]], Optional[list[Cluster]]]],
+        *,
+        randomness_source: Optional[Random],
+    ) -> Tuple[Random, list[Tuple[list[Cluster], list[Cluster]]]]:
+        """
+        Common argument pre-processing for get_auction_winner and get_auction_winners.
+        sides is a list of pairs (reveal_side, miss_side). Pairs where both sides are None are freshly sampled.
+        Returns the randomness source to pass to _determine_auction_winner(s) and the list of sides.
+        """
 
         # Take a default randomness source if None was provided.
         # Note that we don't overwrite randomness_source itself, but rather create a new variable.
@@ -324,29 +415,45 @@ class Market(ABC):
         else:
             real_randomness_source = randomness_source
 
-        if reveal_side is None and miss_side is None:
-            # Note: We use randomness_source, not real_randomness_source here.
-            reveal_side, miss_side = self.sample_sides(
-                randomness_source=randomness_source)
-        # handle the cases where only one of reveal_side and miss_side was None.
-        if reveal_side is None:
-            raise ValueError(
-                "reveal_side was None, but miss_side was not. We do not support this at the moment"
-            )
-        if miss_side is None:
-            raise ValueError(
-                "miss_side was None, but reveal_side was not. We do not support this at the moment"
-            )
-
-        # sanity check. Maybe delete this, if it is too slow?
-        assert all(c in self.participants for c in reveal_side)
-        assert all(c in self.participants for c in miss_side)
-        winner, payments = self._determine_auction_winner(reveal_side=reveal_side,
-                                                          miss_side=miss_side,
-                                                          randomness_source=real_randomness_source,
-                                                          last_slot_proposer=last_slot_proposer)
-        assert winner == "miss" or winner == "reveal"
-        return winner, payments
+        prepared_sides: list[Tuple[list[Cluster], list[Cluster]]] = []
+        for reveal_side, miss_side in sides:
+            if reveal_side is None and miss_side is None:
+                # Note: We use randomness_source, not real_randomness_source here.
+                reveal_side, miss_side = self.sample_sides(
+                    randomness_source=randomness_source)
+            # handle the cases where only one of reveal_side and miss_side was None.
+            if reveal_side is None:
+                raise ValueError(
+                    "reveal_side was None, but miss_side was not. We do not support this at the moment"
+                )
+            if miss_side is None:
+                raise ValueError(
+                    "miss_side was None, but reveal_side was not. We do not support this at the moment"
+                )
+
+            # sanity check. We test against a set rather than the participants list,
+            # so this is O(EPOCH_SIZE) rather than O(EPOCH_SIZE * number of participants).
+            assert self._participant_set.issuperset(reveal_side)
+            assert self._participant_set.issuperset(miss_side)
+            prepared_sides.append((reveal_side, miss_side))
+        return real_randomness_source, prepared_sides
+
+    def _determine_auction_winners(self,
+                                   sides: list[Tuple[list[Cluster], list[Cluster]]],
+                                   randomness_source: Random,
+                                   last_slot_proposer: Cluster
+                                   ) -> list[Tuple[str, dict[Cluster, int | float]]]:
+        """
+        actual implementation of get_auction_winners.
+        By default, this just calls _determine_auction_winner for each auction.
+        Derived classes may override this to share work that only depends on the market state
+        (and not on the sampled sides) between the auctions of a batch.
+        """
+        return [self._determine_auction_winner(reveal_side=reveal_side,
+                                               miss_side=miss_side,
+                                               randomness_source=randomness_source,
+                                               last_slot_proposer=last_slot_proposer)
+                for reveal_side, miss_side in sides]
 
     @abstractmethod
     def _determine_auction_winner(self, 
@@ -373,6 +480,14 @@ class Market(ABC):
         """
         return self.balance_sheets[cluster]
 
+    def get_total_balances(self) -> dict[Cluster, int | float]:
+        """
+        returns a dict {cluster -> total balance} for all market participants.
+        This is meant for reporting at the end of (or during) a simulation
+        and computes all totals in a single pass over the balance sheets.
+        """
+        return {c: balance.total_balance for c, balance in self.balance_sheets.items()}
+
 
 class DummyMarket(Market):
     """
@@ -403,4 +518,5 @@ class DummyMarket(Market):
             randomness_source: Random, last_slot_proposer: Cluster
     ) -> Tuple[str, dict[Cluster, int | float]]:
         # Just answer at random; nobody pays anything.
-        return randomness_source.choice(("miss", "reveal")), {}
+        # (A single random bit is cheaper than randomness_source.choice)
+        return ("miss" if randomness_source.getrandbits(1) else "reveal"), {}
@@ -1,4 +1,6 @@
+import math
 import random
+from collections import Counter
 from typing import Optional
 from random import Random
 
@@ -43,6 +45,7 @@ class Runner:
     default_randomness_source: Optional[Random]  # may be None. If not None, equal to the above.
     last_slot_proposer: Cluster
     proposer_slot_value = DEFAULT_PROPOSER_SLOT_VALUE
+    update_probability: float = 0.01  # probability that a given participant updates its bid in a given epoch.
 
     def __init__(self,
                  market: Market,
@@ -72,6 +75,8 @@ class Runner:
         We do not forward the randomness source from Runner to Market. This is not ideal, but simplifies the API.
         Note that we do not deep-copy the randomness source, so one may use the same (stateful) randomness source for
         each of these. This then behaves as a single randomness source for the whole simulation.
+        Alternatively, utils.split_randomness_source derives independent randomness sources for each of these
+        from a single seeded one.
         """
 
         self.market = market
@@ -151,8 +156,28 @@ class Runner:
         if randomness_source is None:
             randomness_source = self.randomness_source
         participants = self.participants
-        # dummy implementation: Choose each cluster with probability 1%
-        return [c for c in participants if randomness_source.randint(0, 99) == 0]
+        # dummy implementation: Choose each cluster independently with probability update_probability (1% by default)
+        update_probability = self.update_probability
+        if update_probability <= 0:
+            return []
+        if update_probability >= 1:
+            return list(participants)
+
+        # Rather than flipping a coin for every participant, we directly sample the gaps between consecutive chosen
+        # participants. These gaps are geometrically distributed, so we only need about
+        # update_probability * len(participants) random numbers rather than len(participants) many.
+        # The result is distributed exactly as if we had flipped an independent coin for every participant.
+        log_q = math.log1p(-update_probability)
+        rand = randomness_source.random
+        number_of_participants = len(participants)
+        chosen: list[Cluster] = []
+        i = -1
+        while True:
+            # number of skipped participants before the next chosen one. Note that 1.0 - rand() is in (0, 1].
+            i += 1 + int(math.log(1.0 - rand()) / log_q)
+            if i >= number_of_participants:
+                return chosen
+            chosen.append(participants[i])
 
     @property
     def participants(self):
@@ -169,31 +194,43 @@ class Runner:
             balance.capital_cost += balance.capital_locked * interest_rate
 
     def process_market(self):
-        reveal_side, miss_side = self.market.sample_sides(randomness_source=self.default_randomness_source)
-        winner, payments = self.market.get_auction_winner(reveal_side=reveal_side, miss_side=miss_side,
-                                                          randomness_source=self.default_randomness_source)
         bribe_taker = self.last_slot_proposer
+        market = self.market
+        # Shortcut for the common case that the last slot proposer does not take bribes:
+        # Then "reveal" wins, nobody pays anything and no slots are gained or lost. The only thing that matters
+        # is the next last slot proposer, which is the last cluster of the reveal side. We sample just that one
+        # rather than both full sides. (This has the same distribution, but consumes different randomness)
+        if not market.may_take_bribes(bribe_taker):
+            self.last_slot_proposer = market.stake_dist.sample_cluster(randomness_source=self.default_randomness_source)
+            return
+
+        reveal_side, miss_side = market.sample_sides(randomness_source=self.default_randomness_source)
+        winner, payments = market.get_auction_winner(last_slot_proposer=bribe_taker,
+                                                     reveal_side=reveal_side, miss_side=miss_side,
+                                                     randomness_source=self.default_randomness_source)
         balance_sheets = self.balance_sheets
         proposer_slot_value = self.proposer_slot_value
 
         # pay bribes
+        # (The bribe taker's balance sheet is the same for all payments, so we look it up only once)
+        bribe_taker_balance = balance_sheets[bribe_taker]
         for payer, amount in payments.items():
             balance_sheets[payer].paid += amount
-            balance_sheets[bribe_taker].received += amount
-        # number of extra slots gained / lost for each side.
-        # We need to initialize all relevant keys for the dict in order to be able to use += and -= below.
-        net_slots: dict[Cluster, int] = {c: 0 for c in miss_side + reveal_side}
+            bribe_taker_balance.received += amount
+        # number of extra slots gained / lost for each cluster.
+        net_slots: Counter[Cluster]
         if winner == 'miss':
             next_last_slot_proposer = miss_side[-1]
-            net_slots[bribe_taker] = -1  # for forfeiting the slot
-            for c in miss_side:
-                net_slots[c] += 1
-            for c in reveal_side:
-                net_slots[c] -= 1
+            # Each cluster gains a slot for every occurrence on the miss side and loses one for every occurrence
+            # on the reveal side. Counter does the counting in C rather than in a Python loop.
+            net_slots = Counter(miss_side)
+            net_slots.subtract(reveal_side)
+            net_slots[bribe_taker] -= 1  # for forfeiting the slot
         elif winner == 'reveal':
             next_last_slot_proposer = reveal_side[-1]
-            # net_slots stays at an all-0 dict. The reason is that we care about the difference
+            # No slots are gained or lost. The reason is that we care about the difference
             # to the situation where there is no bribery market
+            net_slots = Counter()
         else:
             raise RuntimeError("get_auction_winner returned neither 'miss' nor 'reveal'")
 
@@ -211,6 +248,6 @@ class Runner:
         # We first get all new_bids, then update all those bids.
         # This is done so the updates don't yet affect the other get_best_bid results.
         market = self.market
-        new_bids = {c: market.get_best_bid(c, randomness_source=self.randomness_source) for c in clusters}
+        new_bids = market.get_best_bids(clusters, randomness_source=self.randomness_source)
         for c, new_bid in new_bids.items():
             market.place_bid(new_bid, c)
@@ -50,7 +50,7 @@ class SecondPriceMarket(Market):
                 percentage[c] = self.standing_bids[c].willing_to_pay * 100 /                 (self.reveal_payments(reveal_side) + last_proposer_bid.minimum_gain + own_slots_gained_by_revealing * last_proposer_bid.valuation_of_own_slots)
 
         for c in miss_side:
-            if self.standing_bids[c] is not None
+            if self.standing_bids[c] is not None:
                 percentage[c] = self.standing_bids[c].willing_to_pay * 100 /                    (self.not_reveal_payments(miss_side) + own_slots_gained_by_missing * last_proposer_bid.valuation_of_own_slots)
 
         if self.reveal_payments(reveal_side) + last_proposer_bid.minimum_gain + own_slots_gained_by_revealing * last_proposer_bid.valuation_of_own_slots  >= self.not_reveal_payments(miss_side) + own_slots_gained_by_missing * last_proposer_bid.valuation_of_own_slots:
@@ -1,3 +1,7 @@
+from random import Random
+
+import pytest
+
 from market import Balance, Market, Bid
 from participants import StakeDistribution, make_stake_distribution_from_map
 from market.market import DummyMarket
@@ -109,3 +113,52 @@ def test_market():
     assert m.balance_sheets[some_participant].transaction_costs == 2
     assert m.balance_sheets[some_participant].participated is True
 
+
+def test_get_auction_winners():
+    d = {20: (3, 1), 10: (5, 2), 100: 1}
+    stake_dist: StakeDistribution = make_stake_distribution_from_map(d)
+    m = DummyMarket(stake_dist)
+    last_slot_proposer = m.participants[0]
+
+    results = m.get_auction_winners(last_slot_proposer=last_slot_proposer, number_of_auctions=10)
+    assert len(results) == 10
+    assert all(winner in ("miss", "reveal") and payments == {} for winner, payments in results)
+
+    # The batch version agrees with calling get_auction_winner for each auction with the same randomness.
+    sides = [m.sample_sides() for _ in range(20)]
+    results = m.get_auction_winners(last_slot_proposer=last_slot_proposer, sides=sides, randomness_source=Random(7))
+    randomness_source = Random(7)
+    assert results == [m.get_auction_winner(last_slot_proposer=last_slot_proposer, reveal_side=reveal_side,
+                                            miss_side=miss_side, randomness_source=randomness_source)
+                       for reveal_side, miss_side in sides]
+    assert {winner for winner, _ in results} == {"miss", "reveal"}
+
+    # Sides must either be both given or both None, as in get_auction_winner.
+    with pytest.raises(ValueError):
+        m.get_auction_winners(last_slot_proposer=last_slot_proposer, sides=[(sides[0][0], None)])
+
+
+def test_place_bid_none_is_noop():
+    d = {20: (3, 1), 10: (5, 2), 100: 1}
+    stake_dist: StakeDistribution = make_stake_distribution_from_map(d)
+    clusters = stake_dist.get_clusters()
+    initial_balances = {c: Balance(reputation=3, capital_cost=2) for c in clusters}
+    initial_bids = dict.fromkeys(clusters)
+
+    # Placing a None bid over a None bid must not touch the balances.
+    m = DummyMarket(stake_dist, initial_bids=initial_bids, initial_balances=initial_balances, pay_for_initial_bids=True)
+    assert all(m.balance_sheets[c].reputation == 3 for c in m.participants)
+    assert all(m.balance_sheets[c].capital_cost == 2 for c in m.participants)
+    assert all(m.balance_sheets[c].transaction_costs == 0 for c in m.participants)
+
+
+def test_get_total_balances():
+    d = {20: (3, 1), 10: (5, 2), 100: 1}
+    stake_dist: StakeDistribution = make_stake_distribution_from_map(d)
+    m = DummyMarket(stake_dist)
+    some_participant = m.participants[0]
+    m.place_bid(Bid(), some_participant)  # transaction cost 1, capital cost 10, reputation 5
+    totals = m.get_total_balances()
+    assert set(totals) == set(m.participants)
+    assert totals[some_participant] == -16
+    assert all(totals[c] == m.get_balance_sheet(c).total_balance for c in m.participants)
@@ -1,4 +1,7 @@
+from random import Random
+
 from market import EqualSecondPriceMarket, EqualSecondPriceBid
+from participants import make_stake_distribution_from_map
 
 def test_ESP_maximum_bid_by_side():
     L = [1,2,3,4]
@@ -13,4 +16,98 @@ def test_ESP_maximum_bid_by_side():
     L = [1.0, 2.0, 2.0]
     assert EqualSecondPriceMarket.maximum_bid_by_side(L) == 4.0
 
-    
\ No newline at end of file
+    
+
+def test_ESP_maximum_bid_by_side_edge_cases():
+    # nobody on this side has a bid.
+    assert EqualSecondPriceMarket.maximum_bid_by_side([]) == 0
+
+    # single bidder
+    assert EqualSecondPriceMarket.maximum_bid_by_side([7]) == 7
+
+    # any iterable works, not just lists.
+    assert EqualSecondPriceMarket.maximum_bid_by_side(x for x in [4, 1, 3, 2]) == 6
+    assert EqualSecondPriceMarket.maximum_bid_by_side((10, 1, 1, 1)) == 10
+
+
+class _TestESPMarket(EqualSecondPriceMarket):
+    """
+    EqualSecondPriceMarket does not implement cost_for_bid and get_best_bid (yet),
+    so we fill those in with trivial implementations to be able to test the auction itself.
+    """
+    def cost_for_bid(self, old_bid, new_bid):  # noqa: ARG002
+        return self.CostForBid(0, 0, 0)
+
+    def get_best_bid(self, cluster, *, randomness_source):  # noqa: ARG002
+        return EqualSecondPriceBid()
+
+
+def test_ESP_get_auction_winners():
+    d: dict[int, int | tuple[int, int]] = {10: 5, 20: 3}
+    stake_dist = make_stake_distribution_from_map(d)
+    m = _TestESPMarket(stake_dist)
+    proposer = m.participants[0]
+    sides = [m.sample_sides() for _ in range(5)]
+
+    # The last slot proposer has no bid, so it always reveals and nobody pays.
+    assert m.get_auction_winners(last_slot_proposer=proposer, sides=sides) == [("reveal", {})] * 5
+    # In that case, we do not even need to sample the sides.
+    randomness_source = Random(3)
+    state = randomness_source.getstate()
+    assert m.get_auction_winners(last_slot_proposer=proposer, number_of_auctions=5,
+                                 randomness_source=randomness_source) == [("reveal", {})] * 5
+    assert randomness_source.getstate() == state
+
+    # The batch version agrees with calling get_auction_winner individually.
+    for c in m.participants:
+        m.place_bid(EqualSecondPriceBid(willing_to_pay=c.number_of_validators, willing_to_receive_bribes=True), c)
+    results = m.get_auction_winners(last_slot_proposer=proposer, sides=sides)
+    assert results == [m.get_auction_winner(last_slot_proposer=proposer, reveal_side=reveal_side, miss_side=miss_side)
+                       for reveal_side, miss_side in sides]
+
+
+def test_ESP_determine_auction_winner():
+    d: dict[int, int | tuple[int, int]] = {10: 5, 20: 3}
+    stake_dist = make_stake_distribution_from_map(d)
+    m = _TestESPMarket(stake_dist)
+    proposer, c1, c2, c3, c4, c5 = m.participants[:6]
+
+    m.place_bid(EqualSecondPriceBid(willing_to_receive_bribes=True), proposer)
+    m.place_bid(EqualSecondPriceBid(willing_to_pay=1), c1)
+    m.place_bid(EqualSecondPriceBid(willing_to_pay=1), c2)
+    m.place_bid(EqualSecondPriceBid(willing_to_pay=5), c3)
+    m.place_bid(EqualSecondPriceBid(willing_to_pay=5), c4)
+
+    # miss side collectively bids 10, reveal side only 2.
+    winner, payments = m.get_auction_winner(last_slot_proposer=proposer, reveal_side=[c1, c2], miss_side=[c3, c4])
+    assert winner == "miss"
+    assert payments == {c3: 5, c4: 5}
+
+    # c5 has no bid, so the miss side cannot outbid the reveal side. c5 does not pay anything.
+    winner, payments = m.get_auction_winner(last_slot_proposer=proposer, reveal_side=[c1, c2, c5], miss_side=[c5])
+    assert winner == "reveal"
+    assert payments == {c1: 1, c2: 1, c5: 0}
+
+    # proposer no longer takes bribes.
+    m.place_bid(EqualSecondPriceBid(), proposer)
+    assert m.get_auction_winner(last_slot_proposer=proposer, reveal_side=[c1, c2], miss_side=[c3, c4]) == ("reveal", {})
+
+
+def test_ESP_bid_identity():
+    b1 = EqualSecondPriceBid(willing_to_pay=1)
+    b2 = EqualSecondPriceBid(willing_to_pay=1)
+    assert b1 == b1
+    assert b1 != b2  # bids compare by identity
+    assert len({b1, b2}) == 2  # and are hashable
+
+
+def test_ESP_may_take_bribes():
+    d: dict[int, int | tuple[int, int]] = {10: 3}
+    stake_dist = make_stake_distribution_from_map(d)
+    m = _TestESPMarket(stake_dist)
+    c1, c2, c3 = m.participants
+    m.place_bid(EqualSecondPriceBid(willing_to_pay=1), c2)
+    m.place_bid(EqualSecondPriceBid(willing_to_receive_bribes=True), c3)
+    assert not m.may_take_bribes(c1)  # no bid at all
+    assert not m.may_take_bribes(c2)
+    assert m.may_take_bribes(c3)
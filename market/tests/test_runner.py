@@ -0,0 +1,74 @@
+from random import Random
+
+from market.market import DummyMarket
+from market.runner import Runner
+from participants import make_stake_distribution_from_map
+
+
+def _make_runner(**kwargs) -> Runner:
+    d: dict[int, int | tuple[int, int]] = {10: 500, 20: 300, 100: 200}
+    stake_dist = make_stake_distribution_from_map(d, default_randomness_source=Random(1))
+    market = DummyMarket(stake_dist)
+    return Runner(market, locked_capital_cost_per_epoch=0.01,
+                  initial_last_slot_proposer=market.participants[0], **kwargs)
+
+
+def test_get_participants_who_update():
+    runner = _make_runner(default_randomness_source=Random(2))
+    number_of_participants = len(runner.participants)
+
+    number_of_rounds = 200
+    total = 0
+    for _ in range(number_of_rounds):
+        updating = runner.get_participants_who_update()
+        assert all(c in runner.participants for c in updating)
+        assert len(set(map(id, updating))) == len(updating)  # no participant is chosen twice
+        total += len(updating)
+
+    # each participant updates with probability 1%
+    expected = number_of_rounds * number_of_participants * runner.update_probability
+    assert abs(total - expected) < 0.1 * expected
+
+    runner.update_probability = 1
+    assert runner.get_participants_who_update() == runner.participants
+    runner.update_probability = 0
+    assert runner.get_participants_who_update() == []
+
+    # deterministic given the randomness source
+    runner.update_probability = 0.05
+    assert runner.get_participants_who_update(randomness_source=Random(3)) == \
+        runner.get_participants_who_update(randomness_source=Random(3))
+
+
+def test_update_behaviours():
+    runner = _make_runner()
+    market = runner.market
+    clusters = market.participants[:3]
+    assert market.get_best_bids([], randomness_source=Random()) == {}
+    runner.update_behaviours(clusters)
+    assert all(market.standing_bids[c] is not None for c in clusters)
+    assert all(market.standing_bids[c] is None for c in market.participants[3:])
+
+
+def test_process_market():
+    runner = _make_runner(default_randomness_source=Random(4))
+    for _ in range(20):
+        old_proposer = runner.last_slot_proposer
+        old_net_slot_value = sum(b.extra_slot_earnings - b.extra_slot_costs for b in runner.balance_sheets.values())
+        runner.process_market()
+        assert runner.last_slot_proposer in runner.participants
+        net_slot_value = sum(b.extra_slot_earnings - b.extra_slot_costs for b in runner.balance_sheets.values())
+        # Either nothing changes (reveal) or the bribe taker forfeits one slot in total (miss).
+        assert net_slot_value - old_net_slot_value in (0, -runner.proposer_slot_value)
+        if net_slot_value != old_net_slot_value:
+            assert runner.balance_sheets[old_proposer].extra_slot_costs > 0
+
+
+def test_process_market_no_bribes():
+    runner = _make_runner(default_randomness_source=Random(5))
+    runner.market.may_take_bribes = lambda cluster: False  # noqa: ARG005
+    balances_before = {c: repr(b) for c, b in runner.balance_sheets.items()}
+    for _ in range(20):
+        runner.process_market()
+        assert runner.last_slot_proposer in runner.participants
+    assert {c: repr(b) for c, b in runner.balance_sheets.items()} == balances_before
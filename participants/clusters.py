@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from itertools import accumulate
 from random import Random
-from typing import Iterator, Optional, Tuple
+from typing import Iterator, Optional, Sequence, Tuple
 """
 This file defines the Cluster class, which is used to represent a cluster of validators.
 In the context our our bribery market, these clusters are the market participants.
@@ -32,7 +32,7 @@ class Cluster:
     """
 
     number_of_validators: int  # number of validators this cluster contains
-    reputation_factor: int = 1  # how much this cluster values reputation. May be overridden on a per-object basis.
+    reputation_factor: int | float = 1  # how much this cluster values reputation. May be overridden on a per-object basis.
 
     @property
     def stake_fraction(self) -> float:
@@ -45,7 +45,7 @@ class Cluster:
     def __init__(self,
                  number_of_validators: int = 1,
                  *,
-                 reputation_factor: int | None = None):
+                 reputation_factor: int | float | None = None):
         self.number_of_validators = number_of_validators
 
         # For the passed reputation_factor, we default to None rather than 1.
@@ -116,7 +116,7 @@ class StakeDistribution(ABC):
         """
         ...
 
-    _sample_cluster: Iterator[Cluster]  # Default sampler
+    _sample_cluster: Optional[Iterator[Cluster]] = None  # Default sampler. Created on first use if not set by __init__
 
     @property
     def iterator(self) -> Iterator[Cluster]:
@@ -129,20 +129,63 @@ class StakeDistribution(ABC):
         
         is an infinite loop.
         """
-        if hasattr(self, "_sample_cluster"):
-            return self._sample_cluster
-        else:
-            self._sample_cluster = self.new_iterator(randomness_source=None)
-            return self._sample_cluster
+        sampler = self._sample_cluster
+        if sampler is None:
+            sampler = self._sample_cluster = self.new_iterator(randomness_source=None)
+        return sampler
 
     @abstractmethod
-    def sample_cluster(self, *, randomness_source: Random = None) -> Cluster:
+    def sample_cluster(self, *, randomness_source: Optional[Random] = None) -> Cluster:
         """
         Samples a cluster with probability weighted by stake size.
 
         If randomness_source is None, we use a default.
         """
 
+    def sample_clusters(self, k: int, *, randomness_source: Optional[Random] = None) -> list[Cluster]:
+        """
+        Samples k clusters (with replacement), each with probability weighted by stake size.
+
+        If randomness_source is None, we use a default.
+        Derived classes should override this if they can draw several samples at once more efficiently than
+        by k calls to sample_cluster.
+        """
+        return [self.sample_cluster(randomness_source=randomness_source) for _ in range(k)]
+
+
+def _make_alias_table(weights: Sequence[int | float]) -> Tuple[list[float], list[int]]:
+    """
+    Builds the tables (prob, alias) for Walker's alias method (using Vose's algorithm) for the given weights.
+    To sample an index i with probability weights[i] / sum(weights), pick j uniformly from range(len(weights)),
+    then return j with probability prob[j] and alias[j] otherwise.
+    This takes O(1) per sample, as opposed to a binary search over the cumulative weights.
+    """
+    n = len(weights)
+    total = sum(weights)
+    if total <= 0:
+        # Same error as Random.choices gives for such weights.
+        raise ValueError("Total of weights must be greater than zero")
+    prob: list[float] = [1.0] * n
+    alias: list[int] = list(range(n))
+
+    # Scale the weights such that the average is 1. Each index j owns a bucket of size 1, which is filled
+    # by a part prob[j] of j itself and the remaining 1 - prob[j] by alias[j].
+    scaled = [w * n / total for w in weights]
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        small_idx = small.pop()
+        large_idx = large.pop()
+        prob[small_idx] = scaled[small_idx]
+        alias[small_idx] = large_idx
+        scaled[large_idx] += scaled[small_idx] - 1.0
+        if scaled[large_idx] < 1.0:
+            small.append(large_idx)
+        else:
+            large.append(large_idx)
+    # Whatever remains has (up to rounding errors) scaled weight 1 and keeps prob 1.0, alias to itself.
+    return prob, alias
+
 
 def make_stake_distribution_from_map(
         stake_map: dict[int, int | Tuple[int, int]],
@@ -202,10 +245,11 @@ def make_stake_distribution_from_map(
         of the StakeDistribution that this cluster is part of.
         """
         total_number_of_validators: int  # class variable. Will be set later by NewStakeDistribution.__init__
+        _stake_fraction: float  # Will be set by NewStakeDistribution.__init__, once total_number_of_validators is known
 
         @property
         def stake_fraction(self) -> float:
-            return self.number_of_validators / self.total_number_of_validators
+            return self._stake_fraction
 
     class NewStakeDistribution(StakeDistribution):
         """
@@ -216,34 +260,45 @@ def make_stake_distribution_from_map(
             # embed the arguments passed to make_stake_distribution_from_map into the new instance of
             # type NewStakeDistribution:
             self.stake_map = stake_map
-            clusters = []  # We will set self.cluster = clusters below
 
             r = Random() if default_randomness_source is None else default_randomness_source
+            self._default_randomness_source = r
             self._sample_cluster = self.new_iterator(r)
+
+            # Bring every entry of stake_map into the form cluster_size -> (number of clusters, reputation factor).
+            # Then we can create all clusters with a single list comprehension.
+            counts_and_factors: dict[int, Tuple[int, int | float]] = {}
             for cluster_size, count in stake_map.items():
                 if isinstance(count, int):
-                    clusters += [
-                        ClusterWithTotalStake(
-                            number_of_validators=cluster_size,
-                            reputation_factor=reputation_factor)
-                        for _ in range(count)
-                    ]
+                    counts_and_factors[cluster_size] = (count, reputation_factor)
                 else:
                     assert len(count) == 2  # sequence of 2 ints
-                    clusters += [
-                        ClusterWithTotalStake(
-                            number_of_validators=cluster_size,
-                            reputation_factor=count[1])
-                        for _ in range(count[0])
-                    ]
+                    counts_and_factors[cluster_size] = (count[0], count[1])
+            # (clusters is typed with the local type, so we can set the stake fractions below. self.clusters is a
+            # list[Cluster], as get_clusters promises; since list is invariant, this needs its own list object.)
+            clusters: list[ClusterWithTotalStake] = [
+                ClusterWithTotalStake(number_of_validators=cluster_size, reputation_factor=factor)
+                for cluster_size, (count, factor) in counts_and_factors.items()
+                for _ in range(count)
+            ]
             clusters.sort()
-            self.clusters = clusters
+            self.clusters: list[Cluster] = list(clusters)
 
             self.cluster_sizes = [c.number_of_validators for c in clusters]
-            self.cluster_sizes_cumulated = list(accumulate(self.cluster_sizes))
-
-            ClusterWithTotalStake.total_number_of_validators = sum(
-                [c.number_of_validators for c in clusters])
+            self.cluster_sizes_cumulated = tuple(accumulate(self.cluster_sizes))  # immutable, see NOTE above
+
+            # The last cumulated size is the total (with an empty stake_map, there are no clusters and the total is 0).
+            total = self.cluster_sizes_cumulated[-1] if clusters else 0
+            # We allow creating a stake distribution without any stake, but sampling from it raises a ValueError.
+            if total > 0:
+                self._alias_prob, self._alias_idx = _make_alias_table(self.cluster_sizes)
+            else:
+                self._alias_prob, self._alias_idx = [], []
+            ClusterWithTotalStake.total_number_of_validators = total
+            # Stake distributions must not be modified after creation, so we can compute the stake fractions once.
+            # If there is no stake at all (e.g. all clusters have 0 validators), every cluster has a stake fraction of 0.
+            for c in clusters:
+                c._stake_fraction = c.number_of_validators / total if total else 0.0
 
         # Note: Returned type actually a list[ClusterWithTotalStake] for some local type
         def get_clusters(self) -> list[Cluster]:
@@ -257,20 +312,43 @@ def make_stake_distribution_from_map(
         # custom_sampler = SD.new_cluster_sampler(..., randomness_source = r2)
         # In this construction, the intended behaviour is that
         # default_sampler uses r1, custom_sampler uses r2
+        def _sample_one(self, randomness_source: Random) -> Cluster:
+            """
+            Draws a single cluster with Walker's alias method, which is O(1) per sample.
+            Every way of sampling from this distribution goes through this method.
+            """
+            # A single call to random() gives us both the bucket i (integral part of u) and
+            # the coin to decide between i and its alias (fractional part of u).
+            prob = self._alias_prob
+            if not prob:
+                raise ValueError("Cannot sample from a stake distribution without any stake")
+            u = randomness_source.random() * len(prob)
+            i = int(u)
+            return self.clusters[i] if u - i < prob[i] else self.clusters[self._alias_idx[i]]
+
         def new_iterator(self, randomness_source: Optional[Random] = None) -> Iterator[Cluster]:
             # NOTE: randomness_source shadows name given to make_stake_distribution_from_map.
             # This is unfortunate, but hard to avoid.
             r: Random = randomness_source if randomness_source is not None else Random()
+            sample_one = self._sample_one
             while True:
-                yield r.choices(self.clusters,
-                                cum_weights=self.cluster_sizes_cumulated)[0]
+                yield sample_one(r)
 
         def sample_cluster(self,
                            *,
-                           randomness_source: Random = None) -> Cluster:
+                           randomness_source: Optional[Random] = None) -> Cluster:
+            # We draw directly from the default randomness source rather than resuming the default iterator.
+            # (The iterator uses the same randomness source, so this samples from the same random stream)
+            if randomness_source is None:
+                randomness_source = self._default_randomness_source
+            return self._sample_one(randomness_source)
+
+        def sample_clusters(self, k: int, *, randomness_source: Optional[Random] = None) -> list[Cluster]:
+            # A single loop with the alias table is much faster than k separate calls to sample_cluster
+            # and than choices(..., k=k), which bisects cluster_sizes_cumulated for every sample.
             if randomness_source is None:
-                return next(self.iterator)
-            return randomness_source.choices(
-                self.clusters, cum_weights=self.cluster_sizes_cumulated)[0]
+                randomness_source = self._default_randomness_source
+            sample_one = self._sample_one
+            return [sample_one(randomness_source) for _ in range(k)]
 
     return NewStakeDistribution()
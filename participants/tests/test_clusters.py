@@ -20,6 +20,8 @@
 import itertools
 import random
 
+import pytest
+
 from participants import Cluster, StakeDistribution, make_stake_distribution_from_map
 
 
@@ -96,3 +98,58 @@ def test_make_stake_distribution_from_map():
     samples2 = list(itertools.islice(sampler2, 200))
     samples3 = list(itertools.islice(sampler1, 100))
     assert samples1 + samples3 == samples2
+
+
+def test_sample_clusters():
+    d = {20: (3, 1), 10: (5, 2), 100: 1}
+    SD = make_stake_distribution_from_map(d, default_randomness_source=random.Random(1))
+    clusters = SD.get_clusters()
+
+    number_of_samples = 50000
+    for randomness_source in [None, random.Random(), random.Random(123)]:
+        samples = SD.sample_clusters(number_of_samples, randomness_source=randomness_source)
+        assert len(samples) == number_of_samples
+        assert all(c in clusters for c in samples)
+        num_100 = sum(1 for c in samples if c.number_of_validators == 100) / number_of_samples
+        assert abs(num_100 - 100 / 210) < 0.05
+
+    # same seed gives the same samples
+    assert SD.sample_clusters(100, randomness_source=random.Random(5)) == \
+        SD.sample_clusters(100, randomness_source=random.Random(5))
+
+    assert SD.sample_clusters(0) == []
+
+
+def test_alias_table():
+    from participants.clusters import _make_alias_table
+
+    weights = [10, 10, 20, 20, 20, 100, 1]
+    total = sum(weights)
+    prob, alias = _make_alias_table(weights)
+    assert len(prob) == len(alias) == len(weights)
+
+    # Each index i gets prob[i] of its own bucket plus 1 - prob[j] of every bucket j aliased to it.
+    mass = list(prob)
+    for j, i in enumerate(alias):
+        mass[i] += 1 - prob[j]
+    for i, w in enumerate(weights):
+        assert abs(mass[i] / len(weights) - w / total) < 1e-9
+
+    assert _make_alias_table([5]) == ([1.0], [0])
+    with pytest.raises(ValueError):
+        _make_alias_table([0, 0])
+
+
+def test_stake_distribution_without_stake():
+    SD = make_stake_distribution_from_map({0: 3})
+    clusters = SD.get_clusters()
+    assert len(clusters) == 3
+    assert all(c.stake_fraction == 0 for c in clusters)
+
+    # Sampling fails, since there is no stake to sample by.
+    with pytest.raises(ValueError):
+        SD.sample_cluster()
+    with pytest.raises(ValueError):
+        SD.sample_clusters(1, randomness_source=random.Random(1))
+    with pytest.raises(ValueError):
+        next(SD.new_iterator(random.Random(1)))
@@ -1 +1,4 @@
+from .randomness import split_randomness_source
 from .remove_duplicates import remove_duplicates
+
+__all__ = ["remove_duplicates", "split_randomness_source"]
@@ -0,0 +1,21 @@
+from random import Random
+
+
+def split_randomness_source(randomness_source: Random, number_of_sources: int) -> list[Random]:
+    """
+    Derives number_of_sources new, independent randomness sources from the given randomness_source.
+
+    This is intended to derandomize a simulation from a single seed while giving each of the
+    Runner, the Market and the StakeDistribution its own randomness source, e.g.
+
+        runner_rng, market_rng, stake_dist_rng = split_randomness_source(Random(seed), 3)
+
+    Since the derived sources do not share any state, the random choices made by one component do not depend on
+    how often the other components draw randomness (e.g. changing the order of calls in the Runner does not change the
+    sampled proposers). This also allows running several simulations in parallel without sharing a stateful
+    randomness source.
+
+    Note that this advances the state of randomness_source.
+    """
+    # Seeding with 128 bits from the parent makes collisions between the derived states negligible.
+    return [Random(randomness_source.getrandbits(128)) for _ in range(number_of_sources)]
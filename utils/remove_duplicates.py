@@ -1,3 +1,5 @@
+from collections import Counter
+from itertools import islice
 from typing import Any, Tuple
 
 def remove_duplicates(l1: list[Any],l2: list[Any]) -> Tuple[list[Any], list[Any]]:
@@ -9,38 +11,56 @@ def remove_duplicates(l1: list[Any],l2: list[Any]) -> Tuple[list[Any], list[Any]
     The output may be sorted arbitrarily.
     """
 
-    # make a sorted copy of both lists, sorted by id (i.e. by memory address)
-    l1_copy = sorted([x for x in l1], key=lambda x: id(x))
-    l2_copy = sorted([x for x in l2], key=lambda x: id(x))
-
-    if len(l1) == 0:
-        return [], l2_copy
-    if len(l2) == 0:
-        return l1_copy, []
-    
-    l1_output = [None] * len(l1_copy)
-    l2_output = [None] * len(l2_copy)
-    l1_output = l1_output[0:0]
-    l2_output = l2_output[0:0]
-
-    while True:
-        if l1_copy[-1] is l2_copy[-1]:  # duplicate found
-            l1_copy.pop()  # remove duplicate from both list
-            l2_copy.pop()
-            if len(l1_copy) == 0 or len(l2_copy) == 0:
-                break
-        # if the last element from l2 copy is larger than that of l1_copy, it is (due to sorting) the largest remaining element
-        # of the union of both lists, hence unique (i.e cannot be in the other list). We remove it and put it into the output.
-        elif id(l2_copy[-1]) > id(l1_copy[-1]):
-            l2_output.append(l2_copy.pop())
-            if len(l2_copy) == 0:
-                break
-        # otherwise the largest element from l1_copy is largest among the union of both list and we proceed analogously.
+    # If either list is empty, there is nothing to remove.
+    if not l1 or not l2:
+        return list(l1), list(l2)
+
+    # We build the counts below for l2 (and walk over it twice), so we want l2 to be the shorter list.
+    # If it is not, we swap the roles of l1 and l2 (the problem is symmetric).
+    if len(l2) > len(l1):
+        l2_output, l1_output = remove_duplicates(l2, l1)
+        return l1_output, l2_output
+
+    # Count how often each object (identified by id, i.e. by memory address) occurs in l2.
+    # Note that the ids are unique, because l1 and l2 keep all objects alive.
+    # (Counter does the counting in C. We keep the ids of l2, since we need them again below)
+    ids2 = list(map(id, l2))
+    counts2 = Counter(ids2)
+    get_count = counts2.get
+
+    # Every occurrence in l1 cancels one remaining occurrence in l2, if any. Otherwise, it is kept.
+    # unmatched is the total number of occurrences in l2 that were not cancelled yet. Once it drops to 0,
+    # nothing can be cancelled anymore, so we can keep the rest of l1 without looking at it.
+    unmatched = len(l2)
+    l1_output = []
+    for index, x in enumerate(l1):
+        if not unmatched:
+            l1_output.extend(islice(l1, index, None))
+            break
+        i = id(x)
+        c = get_count(i, 0)
+        if c:
+            counts2[i] = c - 1
+            unmatched -= 1
         else:
-            l1_output.append(l1_copy.pop())
-            if len(l1_copy) == 0:
-                break
+            l1_output.append(x)
+
+    # Now counts2 holds how many occurrences of each object in l2 were not cancelled. We keep that many.
+    # (Which of the occurrences we keep does not matter, since they are all the same object)
+    # If either none or all occurrences were cancelled, we do not need to look at the counts.
+    l2_output: list[Any]
+    if not unmatched:
+        l2_output = []
+    elif unmatched == len(l2):
+        l2_output = list(l2)
+    else:
+        l2_output = []
+        for x, i in zip(l2, ids2, strict=True):
+            c = counts2[i]
+            if c:
+                counts2[i] = c - 1
+                l2_output.append(x)
 
-    return l1_output + l1_copy, l2_output + l2_copy
+    return l1_output, l2_output
 
 # tested
@@ -0,0 +1,23 @@
+from random import Random
+
+from utils import split_randomness_source
+
+
+def test_split_randomness_source():
+    sources = split_randomness_source(Random(42), 3)
+    assert len(sources) == 3
+    assert len({id(s) for s in sources}) == 3
+
+    # derived sources are different from each other
+    first_values = [s.random() for s in sources]
+    assert len(set(first_values)) == 3
+
+    # but deterministic given the parent's seed
+    sources2 = split_randomness_source(Random(42), 3)
+    assert [s.random() for s in sources2] == first_values
+
+    # drawing from one derived source does not affect the others
+    sources3 = split_randomness_source(Random(42), 3)
+    for _ in range(100):
+        sources3[0].random()
+    assert sources3[1].random() == first_values[1]
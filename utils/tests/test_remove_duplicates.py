@@ -16,4 +16,19 @@ def test_remove_duplicates():
     assert (list1 == list1_copy)
     assert (list2 == list2_copy)
     assert(sorted(l1_no_duplicates) == [x5,x5])
-    assert(sorted(l2_no_duplicates) == [x1,x3,x4])
\ No newline at end of file
+    assert(sorted(l2_no_duplicates) == [x1,x3,x4])
+
+def _ids(lists):
+    # Compare results by identity: x1 and x2 below are equal, so comparing with == could not tell them apart.
+    return tuple([id(x) for x in result] for result in lists)
+
+
+def test_remove_duplicates_edge_cases():
+    x1 = [1]
+    x2 = [1]  # equal to x1, but a different object
+    assert _ids(remove_duplicates([], [])) == ([], [])
+    assert _ids(remove_duplicates([x1, x1], [])) == ([id(x1), id(x1)], [])
+    assert _ids(remove_duplicates([], [x2])) == ([], [id(x2)])
+    assert _ids(remove_duplicates([x1], [x2])) == ([id(x1)], [id(x2)])
+    assert _ids(remove_duplicates([x1, x1], [x1, x1])) == ([], [])
+    assert _ids(remove_duplicates([x1, x2, x2, x1], [x1])) == ([id(x2), id(x2), id(x1)], [])